@@ -0,0 +1,49 @@
+# Check the `import melkdb` startup time using `python -X importtime`
+
+import os
+import sys
+import subprocess
+
+BUDGET_US = 20_000
+RUNS = 5
+
+# modules that must not be loaded by `import melkdb`
+FORBIDDEN_MODULES = ('Crypto', 'melkdb.crypto', 'melkdb.client', 'melkdb._dump',
+                     'socket', 'shutil', 'zlib', 'json', 'typing')
+
+
+def measure_import() -> dict:
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import melkdb'],
+                            stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    modules = dict()
+
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+
+        __, cumulative, name = line.split('|')
+        modules[name.strip()] = int(cumulative)
+
+    return modules
+
+
+print('\033[33mMeasuring "import melkdb"...\033[m')
+import_times = list()
+
+for __ in range(RUNS):
+    modules = measure_import()
+    import_times.append(modules['melkdb'])
+
+    for name in modules:
+        if name.startswith(FORBIDDEN_MODULES):
+            print(f'\033[31m{repr(name)} is loaded by "import melkdb"\033[m')
+            sys.exit(1)
+
+best_time = min(import_times)
+print(f'Best import time in {RUNS} runs: {best_time}us (budget: {BUDGET_US}us)')
+
+if best_time > BUDGET_US:
+    print('\033[31mImport time budget exceeded\033[m')
+    sys.exit(1)
+
+print('\033[32mImport time within budget\033[m')
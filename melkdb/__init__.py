@@ -1,2 +1,11 @@
 from .melkdb import MelkDB
 from .__version__ import __version__
+
+
+def __getattr__(name: str):
+    # client (and its socket stack) is only loaded when used
+    if name == 'MelkDBClient':
+        from .client import MelkDBClient
+        return MelkDBClient
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,79 @@
+import os
+import sys
+import argparse
+
+from .server import MelkDBServer
+
+
+def _parse_keys(keys: list) -> dict:
+    encrypt_keys = {}
+
+    for item in keys:
+        name, sep, key = item.partition('=')
+
+        if not sep:
+            raise argparse.ArgumentTypeError(f'invalid key {repr(item)}, use NAME=KEY')
+
+        encrypt_keys[name] = key
+
+    return encrypt_keys
+
+
+def _read_key_file(path: str) -> dict:
+    # one NAME=KEY by line, empty lines and comments are ignored
+    with open(path, 'r') as f:
+        lines = [line.strip() for line in f]
+
+    return _parse_keys([line for line in lines if line and not line.startswith('#')])
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(prog='melkdb')
+    subparsers = parser.add_subparsers(dest='command')
+
+    serve_parser = subparsers.add_parser('serve', help='host databases behind a socket')
+    serve_parser.add_argument('--socket', help='Unix socket path')
+    serve_parser.add_argument('--host', default='127.0.0.1', help='TCP host')
+    serve_parser.add_argument('--port', type=int, help='TCP port')
+    serve_parser.add_argument('--key-file', default=os.environ.get('MELKDB_KEY_FILE'),
+                              help='file with the encrypt key of each database, one NAME=KEY '
+                                   'by line (defaults to $MELKDB_KEY_FILE)')
+    serve_parser.add_argument('--key', action='append', default=[],
+                              help='encrypt key of a database (NAME=KEY); visible to other '
+                                   'users, prefer --key-file')
+
+    args = parser.parse_args(argv)
+
+    if args.command != 'serve':
+        parser.print_help()
+        return 1
+
+    if not args.socket and not args.port:
+        parser.error('--socket or --port is required')
+
+    try:
+        encrypt_keys = dict()
+
+        if args.key_file:
+            encrypt_keys.update(_read_key_file(args.key_file))
+
+        encrypt_keys.update(_parse_keys(args.key))
+    except (argparse.ArgumentTypeError, OSError) as error:
+        parser.error(str(error))
+
+    address = (args.host, args.port) if args.port else None
+    server = MelkDBServer(socket_path=args.socket, address=address,
+                          encrypt_keys=encrypt_keys)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,30 @@
+from __future__ import annotations
+
 import os
-from typing import Union, List
+
+from .utils import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Union, List
+
+# a block is made of three directories (length, first
+# letter and last letter), followed by the item
+BLOCK_DEPTH = 3
+
+
+def is_tree_item_depth(depth: int) -> bool:
+    """Check if a directory depth is of a tree item.
+
+    Directories at depth 0 (database root) and after
+    each block (4, 8, ...) are tree items.
+
+    :param depth: Depth relative to database path
+    :type depth: int
+    :return: True if depth is of a tree item
+    :rtype: bool
+    """
+
+    return depth % (BLOCK_DEPTH + 1) == 0
 
 
 class Block:
@@ -97,3 +122,29 @@ class Block:
             os.mkdir(third_box_path)
 
         return third_box_path
+
+    def prune(self, path: str) -> None:
+        """Remove empty blocks from path to database root.
+
+        Each block is removed only if it is empty, so the
+        pruning stops at the first non-empty block. Tree
+        items (directories of complex keys) are never
+        removed, even if empty.
+
+        :param path: Block path
+        :type path: str
+        """
+
+        if not path.startswith(self._db_path + os.sep):
+            return
+
+        depth = len(os.path.relpath(path, self._db_path).split(os.sep))
+
+        while not is_tree_item_depth(depth):
+            try:
+                os.rmdir(path)
+            except OSError:
+                break
+
+            path = os.path.dirname(path)
+            depth -= 1
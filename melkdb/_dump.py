@@ -0,0 +1,188 @@
+import os
+import json
+import zlib
+import struct
+from typing import BinaryIO, Iterator, Tuple
+
+from .exceptions import InvalidDumpError
+
+MAGIC = b'MELKDUMP'
+FORMAT_VERSION = 1
+FLAG_COMPRESSED = 1
+
+# magic, format version, flags and config length
+HEADER = struct.Struct('<8sBBI')
+# key length, item length and CRC32 of key and item
+RECORD = struct.Struct('<HII')
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class DumpWriter:
+    def __init__(self, fileobj: BinaryIO, config: dict, compress: bool = False) -> None:
+        """Create a instance of DumpWriter class.
+
+        The dump format is: a header with the database
+        config, followed by one record for each item.
+        Each record has two bytes to store the key length,
+        four bytes to store the item length, four bytes to
+        store the CRC32 of key and item, the key and the
+        item file content (encoded by `Item`, encrypted or
+        not). The dump ends with a record with an empty
+        key, which stores the number of records.
+
+        Records are buffered and written in chunks, and
+        are compressed with zlib if `compress` is True.
+
+        :param fileobj: Binary file object
+        :type fileobj: BinaryIO
+        :param config: Database config
+        :type config: dict
+        :param compress: Compress records, defaults to False
+        :type compress: bool, optional
+        """
+
+        self._fileobj = fileobj
+        self._buffer = bytearray()
+        self._count = 0
+        self._compressor = None
+        flags = 0
+
+        if compress:
+            self._compressor = zlib.compressobj(zlib.Z_BEST_SPEED)
+            flags |= FLAG_COMPRESSED
+
+        config = json.dumps(config).encode()
+        fileobj.write(HEADER.pack(MAGIC, FORMAT_VERSION, flags, len(config)) + config)
+
+    def _flush(self) -> None:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+
+        if self._compressor:
+            data = self._compressor.compress(data)
+
+        if data:
+            self._fileobj.write(data)
+
+    def write(self, key: str, item: bytes) -> None:
+        key = key.encode()
+        checksum = zlib.crc32(item, zlib.crc32(key))
+
+        self._buffer += RECORD.pack(len(key), len(item), checksum)
+        self._buffer += key
+        self._buffer += item
+        self._count += 1
+
+        if len(self._buffer) >= CHUNK_SIZE:
+            self._flush()
+
+    def close(self) -> int:
+        self._buffer += RECORD.pack(0, self._count, 0)
+        self._flush()
+
+        if self._compressor:
+            self._fileobj.write(self._compressor.flush())
+
+        return self._count
+
+
+class DumpReader:
+    def __init__(self, fileobj: BinaryIO) -> None:
+        """Create a instance of DumpReader class.
+
+        :param fileobj: Binary file object
+        :type fileobj: BinaryIO
+        :raises InvalidDumpError: If file is not a MelkDB dump
+        """
+
+        self._fileobj = fileobj
+        self._buffer = bytearray()
+        self._decompressor = None
+
+        header = fileobj.read(HEADER.size)
+
+        if len(header) != HEADER.size:
+            raise InvalidDumpError('file is not a MelkDB dump')
+
+        magic, version, flags, config_len = HEADER.unpack(header)
+
+        if magic != MAGIC:
+            raise InvalidDumpError('file is not a MelkDB dump')
+        elif version != FORMAT_VERSION:
+            raise InvalidDumpError(f'dump format version {version} is not supported')
+
+        self.config = json.loads(fileobj.read(config_len))
+
+        if flags & FLAG_COMPRESSED:
+            self._decompressor = zlib.decompressobj()
+
+    def _read(self, size: int) -> bytes:
+        while len(self._buffer) < size:
+            if self._decompressor:
+                # output is limited by chunk, so a highly compressed
+                # input is never expanded at once in memory
+                data = self._decompressor.unconsumed_tail
+
+                if not data:
+                    data = self._fileobj.read(CHUNK_SIZE)
+
+                    if not data:
+                        raise InvalidDumpError('unexpected end of dump')
+
+                data = self._decompressor.decompress(data, CHUNK_SIZE)
+            else:
+                data = self._fileobj.read(CHUNK_SIZE)
+
+                if not data:
+                    raise InvalidDumpError('unexpected end of dump')
+
+            self._buffer += data
+
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def __iter__(self) -> Iterator[Tuple[str, bytes]]:
+        count = 0
+
+        while True:
+            klen, ilen, checksum = RECORD.unpack(self._read(RECORD.size))
+
+            if klen == 0:
+                if ilen != count:
+                    raise InvalidDumpError(f'expected {ilen} items, found {count}')
+                break
+
+            key = self._read(klen)
+            item = self._read(ilen)
+
+            if zlib.crc32(item, zlib.crc32(key)) != checksum:
+                raise InvalidDumpError(f'checksum of item {repr(key.decode())} don\'t match')
+
+            count += 1
+            yield key.decode(), item
+
+
+def iter_items(tree_path: str, prefix: str = '') -> Iterator[Tuple[str, str]]:
+    """Iterate all items of a database tree.
+
+    :param tree_path: Database or tree path
+    :type tree_path: str
+    :param prefix: Key prefix of the tree, defaults to ''
+    :type prefix: str, optional
+    :return: Item key and item file path
+    :rtype: Iterator[Tuple[str, str]]
+    """
+
+    for len_block in os.scandir(tree_path):
+        if not len_block.is_dir():
+            continue
+
+        for first_block in os.scandir(len_block.path):
+            for last_block in os.scandir(first_block.path):
+                for entry in os.scandir(last_block.path):
+                    if entry.is_dir():
+                        yield from iter_items(entry.path, f'{prefix}{entry.name}/')
+                    else:
+                        yield f'{prefix}{entry.name}', entry.path
@@ -1,36 +1,90 @@
+from __future__ import annotations
+
 import struct
-from typing import Union
+import os
 from io import BufferedReader, BytesIO
 
-from .crypto import Cryptography
-from .exceptions import *
+from .exceptions import ValueNotSupportedError
+from . import utils
+from .utils import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Union, Callable, Tuple
+    from .crypto import Cryptography, AEADCryptography
 
 INT_TYPE = -1
 FLOAT_TYPE = -2
 BOOL_TYPE = -3
 
+# int values are stored with 4 bytes
+INT_MIN = -2 ** 31
+INT_MAX = 2 ** 31 - 1
+
+# string length is stored in the 2 bytes header
+STR_MAX_LEN = 2 ** 15 - 1
+
+# size of the value length header
+HEADER_SIZE = 2
+
 
 class Item:
-    def __init__(self, crypto: Union[Cryptography, None] = None) -> None:
+    def __init__(self, crypto: Union['Cryptography', 'AEADCryptography', None] = None) -> None:
         """Create a instance of Item class.
 
         :param crypto: Cryptography class instance, defaults to None
-        :type crypto: Union[Cryptography, None], optional
+        :type crypto: Union[Cryptography, AEADCryptography, None], optional
         """
 
         self._crypto = crypto
 
-    def encode(self, value: Union[str, int, float, bool]) -> bytes:
+    @staticmethod
+    def _value_format(vlen: int) -> Tuple[str, int]:
+        if vlen == INT_TYPE:
+            return 'i', 4
+        elif vlen == FLOAT_TYPE:
+            return 'f', 4
+        elif vlen == BOOL_TYPE:
+            return '?', 1
+
+        return f'{vlen}s', vlen
+
+    @staticmethod
+    def stored_value(value: Union[str, int, float, bool]) -> Union[str, int, float, bool]:
+        """Get a value as it is read after being stored.
+
+        Floats are stored with 4 bytes, so they are
+        rounded to single precision.
+
+        :param value: Item value
+        :type value: Union[str, int, float, bool]
+        :return: Stored value
+        :rtype: Union[str, int, float, bool]
+        """
+
+        if isinstance(value, float):
+            value, = struct.unpack('<f', struct.pack('<f', value))
+
+        return value
+
+    @staticmethod
+    def _associated_data(key: Union[None, str]) -> Union[None, bytes]:
+        if key is not None:
+            return key.encode()
+
+    def encode(self, value: Union[str, int, float, bool], key: Union[None, str] = None) -> bytes:
         """Encode item value.
 
         The format of pure data encoding is: two bytes
         to store the size of the value and a fixed or
         dynamic size of bytes to store the value.
 
-        Value will be encrypted if cryptography is enabled.
+        Value will be encrypted if cryptography is enabled,
+        using the item key as associated data.
 
         :param value: Item value
         :type value: Union[str, int, float, bool]
+        :param key: Item key, defaults to None
+        :type key: Union[None, str], optional
         :raises ValueNotSupportedError: If value is not supported
         :return: Encoded value
         :rtype: bytes
@@ -38,9 +92,16 @@ class Item:
 
         if isinstance(value, str):
             vlen = len(value)
+
+            if vlen > STR_MAX_LEN:
+                raise ValueNotSupportedError(f'str of length {vlen} is too long (max {STR_MAX_LEN})')
+
             pack_fmt = f'{vlen}s'
             value = value.encode()
         elif isinstance(value, int):
+            if not INT_MIN <= value <= INT_MAX:
+                raise ValueNotSupportedError(f'int {value} is out of range ({INT_MIN} to {INT_MAX})')
+
             vlen = INT_TYPE
             pack_fmt = 'i'
         elif isinstance(value, float):
@@ -55,43 +116,91 @@ class Item:
         item = struct.pack(f'<h{pack_fmt}', vlen, value)
 
         if self._crypto:
-            item = self._crypto.encrypt(item)
+            item = self._crypto.encrypt(item, self._associated_data(key))
 
         return item
 
-    def decode(self, buf_reader: BufferedReader) -> Union[str, int, float, bool]:
+    def decode(self, buf_reader: BufferedReader,
+               key: Union[None, str] = None) -> Union[str, int, float, bool]:
         """Decode a item value from file.
 
         Value will be decrypted if cryptography is enabled.
 
         :param buf_reader: File buffered reader
         :type buf_reader: BufferedReader
+        :param key: Item key, defaults to None
+        :type key: Union[None, str], optional
         :return: Decoded value
         :rtype: Union[str, int, float, bool]
         """
 
         if self._crypto:
-            buf_reader = self._crypto.decrypt(buf_reader.read())
+            buf_reader = self._crypto.decrypt(buf_reader.read(), self._associated_data(key))
             buf_reader = BytesIO(buf_reader)
 
-        vlen, = struct.unpack('h', buf_reader.read(2))
-
-        if vlen == INT_TYPE:
-            fmt = 'i'
-            rsize = 4
-        elif vlen == FLOAT_TYPE:
-            fmt = 'f'
-            rsize = 4
-        elif vlen == BOOL_TYPE:
-            fmt = '?'
-            rsize = 1
-        else:
-            fmt = f'{vlen}s'
-            rsize = vlen
-
+        vlen, = struct.unpack('h', buf_reader.read(HEADER_SIZE))
+        fmt, rsize = self._value_format(vlen)
         value, = struct.unpack(f'<{fmt}', buf_reader.read(rsize))
 
         if isinstance(value, bytes):
             value = value.decode()
 
         return value
+
+    def modify(self, fd: int, function: Callable, key: Union[None, str] = None) -> Union[str, int, float, bool]:
+        """Modify a item value in file.
+
+        The file must be locked by the caller. For pure
+        data, only the changed parts of the item are
+        written in place: the value of numbers (fixed size)
+        or the appended bytes of strings, and the header
+        when the value length changes.
+
+        Encrypted items are decrypted, modified and
+        rewritten entirely.
+
+        :param fd: Item file descriptor
+        :type fd: int
+        :param function: Function that receives the current
+        value and returns the new value
+        :type function: Callable
+        :param key: Item key, defaults to None
+        :type key: Union[None, str], optional
+        :return: New item value, as stored
+        :rtype: Union[str, int, float, bool]
+        """
+
+        if self._crypto:
+            token = utils.pread(fd, os.fstat(fd).st_size, 0)
+            value = self.decode(BytesIO(token), key)
+            new_value = function(value)
+            new_item = self.encode(new_value, key)
+
+            utils.pwrite(fd, new_item, 0)
+            os.ftruncate(fd, len(new_item))
+            return self.stored_value(new_value)
+
+        header = utils.pread(fd, HEADER_SIZE, 0)
+        vlen, = struct.unpack('<h', header)
+        __, rsize = self._value_format(vlen)
+        payload = utils.pread(fd, rsize, HEADER_SIZE)
+
+        new_value = function(self.decode(BytesIO(header + payload)))
+        new_item = self.encode(new_value)
+        item_size = HEADER_SIZE + rsize
+
+        # the value is written before the header, so that
+        # a concurrent reader never sees a longer length
+        # header than the stored value
+        if new_item[HEADER_SIZE:item_size] == payload:
+            utils.pwrite(fd, new_item[item_size:], item_size)
+        else:
+            utils.pwrite(fd, new_item[HEADER_SIZE:], HEADER_SIZE)
+
+        if new_item[:HEADER_SIZE] != header:
+            utils.pwrite(fd, new_item[:HEADER_SIZE], 0)
+
+        if len(new_item) < item_size:
+            os.ftruncate(fd, len(new_item))
+
+        return self.stored_value(new_value)
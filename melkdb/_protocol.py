@@ -0,0 +1,105 @@
+import struct
+from typing import Tuple
+
+# frame header: payload length and operation code
+# (or status code, in responses)
+HEADER = struct.Struct('<IB')
+HEADER_SIZE = HEADER.size
+
+KEY_LEN = struct.Struct('<H')
+
+OP_SELECT = 1
+OP_GET = 2
+OP_ADD = 3
+OP_UPDATE = 4
+OP_DELETE = 5
+OP_INCR = 6
+OP_APPEND = 7
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+
+def pack_frame(code: int, payload: bytes = b'') -> bytes:
+    """Pack a protocol frame.
+
+    The frame format is: four bytes to store the
+    payload length, one byte to store the operation
+    code (or status code) and the payload.
+
+    :param code: Operation or status code
+    :type code: int
+    :param payload: Frame payload, defaults to b''
+    :type payload: bytes, optional
+    :return: Packed frame
+    :rtype: bytes
+    """
+
+    return HEADER.pack(len(payload), code) + payload
+
+
+def pack_key(key: str, value: bytes = b'') -> bytes:
+    """Pack a request payload with key and encoded value.
+
+    :param key: Item key
+    :type key: str
+    :param value: Encoded item value, defaults to b''
+    :type value: bytes, optional
+    :return: Request payload
+    :rtype: bytes
+    """
+
+    key = key.encode()
+    return KEY_LEN.pack(len(key)) + key + value
+
+
+def unpack_key(payload: bytes) -> Tuple[str, bytes]:
+    """Unpack a request payload.
+
+    :param payload: Request payload
+    :type payload: bytes
+    :return: Item key and encoded item value
+    :rtype: Tuple[str, bytes]
+    """
+
+    klen, = KEY_LEN.unpack_from(payload)
+    key_end = KEY_LEN.size + klen
+    return payload[KEY_LEN.size:key_end].decode(), payload[key_end:]
+
+
+def pack_error(error: Exception) -> bytes:
+    """Pack a exception as error response payload.
+
+    :param error: Raised exception
+    :type error: Exception
+    :return: Error payload
+    :rtype: bytes
+    """
+
+    return pack_key(type(error).__name__, str(error).encode())
+
+
+def unpack_frames(buffer: bytearray) -> Tuple[list, int]:
+    """Unpack all complete frames from a buffer.
+
+    :param buffer: Received data
+    :type buffer: bytearray
+    :return: List of (code, payload) and consumed size
+    :rtype: Tuple[list, int]
+    """
+
+    frames = []
+    offset = 0
+    buffer_len = len(buffer)
+
+    while buffer_len - offset >= HEADER_SIZE:
+        plen, code = HEADER.unpack_from(buffer, offset)
+        frame_end = offset + HEADER_SIZE + plen
+
+        if frame_end > buffer_len:
+            break
+
+        frames.append((code, bytes(buffer[offset + HEADER_SIZE:frame_end])))
+        offset = frame_end
+
+    return frames, offset
@@ -0,0 +1,329 @@
+import socket
+import threading
+from io import BytesIO
+from typing import Union, List, Tuple
+
+from . import exceptions
+from ._item import Item
+from . import _protocol
+
+RECV_SIZE = 65536
+
+
+class _Connection:
+    def __init__(self, sock: socket.socket) -> None:
+        self._sock = sock
+        self._buffer = bytearray()
+        self._frames = []
+
+    def send(self, data: bytes) -> None:
+        self._sock.sendall(data)
+
+    def recv_frames(self, count: int) -> list:
+        while len(self._frames) < count:
+            data = self._sock.recv(RECV_SIZE)
+
+            if not data:
+                raise ConnectionError('connection closed by server')
+
+            self._buffer += data
+            frames, consumed = _protocol.unpack_frames(self._buffer)
+            del self._buffer[:consumed]
+            self._frames.extend(frames)
+
+        frames = self._frames[:count]
+        del self._frames[:count]
+        return frames
+
+    def close(self) -> None:
+        self._sock.close()
+
+
+class Pipeline:
+    def __init__(self, client: 'MelkDBClient') -> None:
+        """Create a instance of Pipeline class.
+
+        A pipeline buffers requests and sends them to
+        the server at once in `execute()`, waiting for
+        all responses with a single round trip. When used
+        as a context manager, the requests are executed on
+        exit and their results are stored in `results`.
+
+        :param client: MelkDB client
+        :type client: MelkDBClient
+        """
+
+        self._client = client
+        self._requests = []
+        self.results = []
+
+    def __enter__(self) -> 'Pipeline':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None and self._requests:
+            self.execute()
+
+    @staticmethod
+    def _check_key(key: str) -> None:
+        if not isinstance(key, str):
+            raise exceptions.KeyIsNotAStringError('The key must be a string')
+
+    def get(self, key: str) -> 'Pipeline':
+        self._check_key(key)
+        self._requests.append((_protocol.OP_GET, _protocol.pack_key(key)))
+        return self
+
+    def add(self, key: str, value: Union[str, int, float, bool]) -> 'Pipeline':
+        self._check_key(key)
+        encoded_value = self._client._item.encode(value)
+        self._requests.append((_protocol.OP_ADD, _protocol.pack_key(key, encoded_value)))
+        return self
+
+    def update(self, key: str, value: Union[str, int, float, bool]) -> 'Pipeline':
+        self._check_key(key)
+        encoded_value = self._client._item.encode(value)
+        self._requests.append((_protocol.OP_UPDATE, _protocol.pack_key(key, encoded_value)))
+        return self
+
+    def incr(self, key: str, delta: Union[int, float] = 1) -> 'Pipeline':
+        self._check_key(key)
+        encoded_delta = self._client._item.encode(delta)
+        self._requests.append((_protocol.OP_INCR, _protocol.pack_key(key, encoded_delta)))
+        return self
+
+    def decr(self, key: str, delta: Union[int, float] = 1) -> 'Pipeline':
+        return self.incr(key, -delta)
+
+    def append(self, key: str, text: str) -> 'Pipeline':
+        self._check_key(key)
+        encoded_text = self._client._item.encode(text)
+        self._requests.append((_protocol.OP_APPEND, _protocol.pack_key(key, encoded_text)))
+        return self
+
+    def delete(self, key: str) -> 'Pipeline':
+        self._check_key(key)
+        self._requests.append((_protocol.OP_DELETE, _protocol.pack_key(key)))
+        return self
+
+    def execute(self) -> list:
+        """Send all buffered requests.
+
+        The exception of the first failed request is
+        raised after all responses are received.
+
+        :return: Result of each request
+        :rtype: list
+        """
+
+        requests = self._requests
+        self._requests = []
+        self.results = self._client._execute(requests)
+        return self.results
+
+
+class MelkDBClient:
+    def __init__(self, name: str, socket_path: Union[None, str] = None,
+                 address: Union[None, Tuple[str, int]] = None,
+                 pool_size: int = 8) -> None:
+        """Create a instance of MelkDBClient class.
+
+        The client has the same `get/add/update/delete`
+        and `incr/decr/append` API of `MelkDB` class, using
+        a database hosted by `melkdb serve`. Connections
+        are kept in a pool and reused between requests.
+
+        :param name: Database name
+        :type name: str
+        :param socket_path: Server Unix socket path, defaults to None
+        :type socket_path: Union[None, str], optional
+        :param address: Server TCP address (host, port), defaults to None
+        :type address: Union[None, Tuple[str, int]], optional
+        :param pool_size: Max idle connections in pool, defaults to 8
+        :type pool_size: int, optional
+        :raises ValueError: If no socket path or address is given
+        """
+
+        if not socket_path and not address:
+            raise ValueError('a socket path or a TCP address is required')
+
+        self._name = name
+        self._socket_path = socket_path
+        self._address = address
+        self._pool_size = pool_size
+        self._pool = []
+        self._pool_lock = threading.Lock()
+        self._item = Item()
+
+    def _connect(self) -> _Connection:
+        if self._socket_path:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self._socket_path)
+        else:
+            sock = socket.create_connection(self._address)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        conn = _Connection(sock)
+        conn.send(_protocol.pack_frame(_protocol.OP_SELECT, self._name.encode()))
+        (status, payload), = conn.recv_frames(1)
+
+        if status != _protocol.STATUS_OK:
+            conn.close()
+            self._raise_error(payload)
+
+        return conn
+
+    def _acquire(self) -> _Connection:
+        with self._pool_lock:
+            if self._pool:
+                return self._pool.pop()
+
+        return self._connect()
+
+    def _release(self, conn: _Connection) -> None:
+        with self._pool_lock:
+            if len(self._pool) < self._pool_size:
+                self._pool.append(conn)
+                return
+
+        conn.close()
+
+    @staticmethod
+    def _raise_error(payload: bytes) -> None:
+        error_name, message = _protocol.unpack_key(payload)
+        error_class = getattr(exceptions, error_name, exceptions.ServerError)
+
+        if not (isinstance(error_class, type) and issubclass(error_class, Exception)):
+            error_class = exceptions.ServerError
+
+        raise error_class(message.decode())
+
+    def _execute(self, requests: List[Tuple[int, bytes]]) -> list:
+        conn = self._acquire()
+
+        try:
+            conn.send(b''.join(_protocol.pack_frame(op, p) for op, p in requests))
+            responses = conn.recv_frames(len(requests))
+        except Exception:
+            conn.close()
+            raise
+
+        self._release(conn)
+
+        results = []
+        error_payload = None
+
+        for status, payload in responses:
+            if status != _protocol.STATUS_OK:
+                if error_payload is None:
+                    error_payload = payload
+                results.append(None)
+            elif payload:
+                results.append(self._item.decode(BytesIO(payload)))
+            else:
+                results.append(None)
+
+        if error_payload is not None:
+            self._raise_error(error_payload)
+
+        return results
+
+    def pipeline(self) -> Pipeline:
+        """Create a pipeline of requests.
+
+        :return: Pipeline instance
+        :rtype: Pipeline
+        """
+
+        return Pipeline(self)
+
+    def add(self, key: str, value: Union[str, int, float, bool]) -> None:
+        """Add a item to database.
+
+        :param key: Item key
+        :type key: str
+        :param value: Item value
+        :type value: Union[str, int, float, bool]
+        """
+
+        self.pipeline().add(key, value).execute()
+
+    def get(self, key: str) -> Union[None, str, int, float, bool]:
+        """Get a item from database
+
+        :param key: Item key
+        :type key: str
+        :return: Returns the item value
+        :rtype: Union[None, str, int, float, bool]
+        """
+
+        return self.pipeline().get(key).execute()[0]
+
+    def delete(self, key: str) -> None:
+        """Delete a item from database
+
+        :param key: Item key
+        :type key: str
+        """
+
+        self.pipeline().delete(key).execute()
+
+    def update(self, key: str, value: Union[str, int, float, bool]) -> None:
+        """Update a item in database.
+
+        :param key: Item key
+        :type key: str
+        :param value: Item value
+        :type value: Union[str, int, float, bool]
+        """
+
+        self.pipeline().update(key, value).execute()
+
+    def incr(self, key: str, delta: Union[int, float] = 1) -> Union[int, float]:
+        """Increment a number item atomically.
+
+        :param key: Item key
+        :type key: str
+        :param delta: Value to add, defaults to 1
+        :type delta: Union[int, float], optional
+        :return: Returns the new item value
+        :rtype: Union[int, float]
+        """
+
+        return self.pipeline().incr(key, delta).execute()[0]
+
+    def decr(self, key: str, delta: Union[int, float] = 1) -> Union[int, float]:
+        """Decrement a number item atomically.
+
+        :param key: Item key
+        :type key: str
+        :param delta: Value to subtract, defaults to 1
+        :type delta: Union[int, float], optional
+        :return: Returns the new item value
+        :rtype: Union[int, float]
+        """
+
+        return self.pipeline().decr(key, delta).execute()[0]
+
+    def append(self, key: str, text: str) -> str:
+        """Append a text to a string item atomically.
+
+        :param key: Item key
+        :type key: str
+        :param text: Text to append
+        :type text: str
+        :return: Returns the new item value
+        :rtype: str
+        """
+
+        return self.pipeline().append(key, text).execute()[0]
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+
+        with self._pool_lock:
+            pool = self._pool
+            self._pool = []
+
+        for conn in pool:
+            conn.close()
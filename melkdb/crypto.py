@@ -1,7 +1,8 @@
 import struct
 from io import BytesIO
-from hashlib import sha256
+from hashlib import sha256, pbkdf2_hmac
 from secrets import token_bytes
+from typing import Union
 
 from Crypto.Cipher import AES
 from Crypto.Util import Padding
@@ -9,9 +10,27 @@ from Crypto.Hash import HMAC, SHA256
 
 from . import exceptions
 
+LEGACY_CIPHER = 'aes-cbc-hmac'
+AES_OCB_CIPHER = 'aes-256-ocb-v1'
+DEFAULT_CIPHER = AES_OCB_CIPHER
+
+KDF_ITERATIONS = 200_000
+SALT_SIZE = 16
+
 
 class Cryptography:
     def __init__(self, key: str) -> None:
+        """Create a instance of legacy Cryptography class.
+
+        This is the `aes-cbc-hmac` cipher used by databases
+        created before the cipher mode was recorded in
+        `config.json`. It is kept unchanged so that these
+        databases remain readable.
+
+        :param key: Encrypt key
+        :type key: str
+        """
+
         hash_key = sha256(key.encode()).digest()
         self._encryption_key = hash_key[:128]
         self._signature_key = hash_key[128:]
@@ -32,7 +51,7 @@ class Cryptography:
         else:
             return True
     
-    def encrypt(self, data: bytes) -> bytes:
+    def encrypt(self, data: bytes, associated_data: Union[None, bytes] = None) -> bytes:
         random_iv = token_bytes(16)
         padding_data = Padding.pad(data, AES.block_size)
 
@@ -49,7 +68,7 @@ class Cryptography:
 
         return result
 
-    def decrypt(self, token: bytes) -> bytes:
+    def decrypt(self, token: bytes, associated_data: Union[None, bytes] = None) -> bytes:
         token_buf = BytesIO(token)
         enc_len, mac_len = struct.unpack('<HH', token_buf.read(4))
         flen = (enc_len + mac_len) + 16
@@ -66,3 +85,115 @@ class Cryptography:
             return unpad_data
         else:
             raise exceptions.DecryptFailed('Token signature don\'t match')
+
+
+class AEADCryptography:
+    NONCE_SIZE = 12
+    TAG_SIZE = 16
+
+    def __init__(self, key: str, salt: bytes) -> None:
+        """Create a instance of AEADCryptography class.
+
+        The encryption key is derived once from the user
+        key and the database salt using PBKDF2-HMAC-SHA256
+        (this takes about 100ms, once per database open).
+        Each item is encrypted and authenticated in a single
+        AES-256-OCB pass (the AEAD mode with the lowest per
+        item setup cost in pycryptodome), and the token format
+        is: 12 bytes of nonce, the ciphertext and 16 bytes of tag.
+
+        :param key: Encrypt key
+        :type key: str
+        :param salt: Database salt
+        :type salt: bytes
+        """
+
+        self._encryption_key = pbkdf2_hmac('sha256', key.encode(), salt, KDF_ITERATIONS)
+
+    def _new_cipher(self, nonce: bytes):
+        return AES.new(self._encryption_key, AES.MODE_OCB, nonce=nonce)
+
+    def encrypt(self, data: bytes, associated_data: Union[None, bytes] = None) -> bytes:
+        """Encrypt and authenticate data.
+
+        :param data: Data to encrypt
+        :type data: bytes
+        :param associated_data: Data authenticated but not
+        encrypted (item key), defaults to None
+        :type associated_data: Union[None, bytes], optional
+        :return: Encrypted token
+        :rtype: bytes
+        """
+
+        nonce = token_bytes(self.NONCE_SIZE)
+        cipher = self._new_cipher(nonce)
+
+        if associated_data:
+            cipher.update(associated_data)
+
+        encrypted_data, tag = cipher.encrypt_and_digest(data)
+        return nonce + encrypted_data + tag
+
+    def decrypt(self, token: bytes, associated_data: Union[None, bytes] = None) -> bytes:
+        """Verify and decrypt a token.
+
+        :param token: Encrypted token
+        :type token: bytes
+        :param associated_data: Data used on encryption, defaults to None
+        :type associated_data: Union[None, bytes], optional
+        :raises DecryptFailed: If token is invalid or was modified
+        :return: Decrypted data
+        :rtype: bytes
+        """
+
+        if len(token) < (self.NONCE_SIZE + self.TAG_SIZE):
+            raise exceptions.DecryptFailed('The token is invalid')
+
+        nonce = token[:self.NONCE_SIZE]
+        encrypted_data = token[self.NONCE_SIZE:-self.TAG_SIZE]
+        tag = token[-self.TAG_SIZE:]
+
+        cipher = self._new_cipher(nonce)
+
+        if associated_data:
+            cipher.update(associated_data)
+
+        try:
+            return cipher.decrypt_and_verify(encrypted_data, tag)
+        except ValueError:
+            raise exceptions.DecryptFailed('Token signature don\'t match') from None
+
+
+def new_cipher_config() -> dict:
+    """Create the cipher settings of a new database.
+
+    :return: Cipher settings to store in `config.json`
+    :rtype: dict
+    """
+
+    return {'cipher': DEFAULT_CIPHER, 'salt': token_bytes(SALT_SIZE).hex()}
+
+
+def get_cryptography(key: str, config: dict) -> Union[Cryptography, AEADCryptography]:
+    """Get the cryptography instance of a database.
+
+    Databases without a `cipher` field in `config.json`
+    use the legacy `aes-cbc-hmac` cipher.
+
+    :param key: Encrypt key
+    :type key: str
+    :param config: Database config
+    :type config: dict
+    :raises IncompatibleDatabaseError: If cipher is unknown
+    :return: Cryptography instance
+    :rtype: Union[Cryptography, AEADCryptography]
+    """
+
+    cipher = config.get('cipher', LEGACY_CIPHER)
+
+    if cipher == LEGACY_CIPHER:
+        return Cryptography(key)
+    elif cipher == AES_OCB_CIPHER:
+        return AEADCryptography(key, bytes.fromhex(config['salt']))
+
+    raise exceptions.IncompatibleDatabaseError(f'Cipher {repr(cipher)} is not supported')
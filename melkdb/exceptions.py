@@ -46,3 +46,18 @@ class KeyIsATreeError(Exception):
 class ItemIsNotATreeError(Exception):
     def __init__(self, *args: object) -> None:
         super().__init__(*args)
+
+
+class ServerError(Exception):
+    def __init__(self, *args: object) -> None:
+        super().__init__(*args)
+
+
+class DatabaseAlreadyExistsError(Exception):
+    def __init__(self, *args: object) -> None:
+        super().__init__(*args)
+
+
+class InvalidDumpError(Exception):
+    def __init__(self, *args: object) -> None:
+        super().__init__(*args)
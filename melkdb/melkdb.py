@@ -1,26 +1,32 @@
-import os
-import json
-import shutil
+from __future__ import annotations
 
-from typing import Union
-from pathlib import Path
+import os
 
 from .__version__ import __version__
-from .crypto import Cryptography
-from .exceptions import *
-from ._block import Block
+from .exceptions import (EncryptKeyRequiredError, DatabaseNotEncryptedError,
+                         KeyIsNotAStringError, InvalidCharInKeyError,
+                         IncompatibleDatabaseError, ItemNotExistsError,
+                         KeyIsATreeError, ItemIsNotATreeError,
+                         ValueNotSupportedError, DatabaseAlreadyExistsError,
+                         InvalidDumpError, DecryptFailed)
+from ._block import Block, is_tree_item_depth
 from ._item import Item
 from . import utils
+from .utils import TYPE_CHECKING
 
-HOME_PATH = Path().home()
+if TYPE_CHECKING:
+    from typing import Union, Callable, BinaryIO
+
+HOME_PATH = os.path.expanduser('~')
 MELKDB_STORAGE_PATH = os.path.join(HOME_PATH, '.melkdb.databases')
 
-if not os.path.isdir(MELKDB_STORAGE_PATH):
-    os.mkdir(MELKDB_STORAGE_PATH)
+# max block paths remembered by `restore()`
+RESTORE_CACHE_SIZE = 100_000
 
 
 class MelkDB:
-    def __init__(self, name: str, encrypt_key: Union[None, str] = None):
+    def __init__(self, name: str, encrypt_key: Union[None, str] = None,
+                 auto_vacuum: bool = False):
         """Create a instance of MelkDB class.
 
         A database with the specified name will be
@@ -34,31 +40,37 @@ class MelkDB:
         :type name: str
         :param encrypt_key: Encrypt key , defaults to None
         :type encrypt_key: Union[None, str], optional
+        :param auto_vacuum: Remove empty blocks (but not empty
+        trees) when deleting items. Not safe while other processes
+        add items to the database, defaults to False
+        :type auto_vacuum: bool, optional
         :raises IncompatibleDatabaseError: If database version not
         match with current MelkDB version.
         """
 
         self._db_path = os.path.join(MELKDB_STORAGE_PATH, name)
-        crypto = None
-
-        if encrypt_key:
-            crypto = Cryptography(encrypt_key)
-
-        self._item = Item(crypto)
-        self._block = Block(self._db_path)
-
+        self._auto_vacuum = auto_vacuum
         db_config_path = os.path.join(self._db_path, 'config.json')
+
+        # json is only loaded when a database is opened
+        import json
         
         if not os.path.isdir(self._db_path):
-            os.mkdir(self._db_path)
+            # storage directory is created with the first database
+            os.makedirs(self._db_path)
 
             with open(db_config_path, 'w') as f:
-                if crypto:
+                if encrypt_key:
                     is_crypto = True
                 else:
                     is_crypto = False
 
                 config = {'version': __version__, 'iscrypto': is_crypto}
+
+                if is_crypto:
+                    from . import crypto
+                    config.update(crypto.new_cipher_config())
+
                 json.dump(config, f)
         else:
             with open(db_config_path, 'rb') as f:
@@ -79,7 +91,18 @@ class MelkDB:
                 raise IncompatibleDatabaseError(f'{repr(name)} created with {db_major_v}.x.x'
                                                  'MelkDB version')
 
-    def _add_tree(self, key_parts: list, value: Union[str, int, float, bool]) -> None:
+        db_crypto = None
+
+        if encrypt_key:
+            # crypto stack is only loaded by encrypted databases
+            from . import crypto
+            db_crypto = crypto.get_cryptography(encrypt_key, config)
+
+        self._config = config
+        self._item = Item(db_crypto)
+        self._block = Block(self._db_path)
+
+    def _make_tree_path(self, key_parts: list) -> str:
         key_parts_len = len(key_parts)
         sub_block_path = None
 
@@ -97,8 +120,13 @@ class MelkDB:
                 if not os.path.isdir(sub_block_path):
                     os.mkdir(sub_block_path)
 
+        return data_path
+
+    def _add_tree(self, key_parts: list, value: Union[str, int, float, bool]) -> None:
+        data_path = self._make_tree_path(key_parts)
+
         with open(data_path, 'wb') as f:
-            item = self._item.encode(value)
+            item = self._item.encode(value, '/'.join(key_parts))
             f.write(item)
 
     def add(self, key: str, value: Union[str, int, float, bool]) -> None:
@@ -125,7 +153,7 @@ class MelkDB:
         else:
             block_path = self._block.make_path(key)
             data_path = os.path.join(block_path, key)
-            item = self._item.encode(value)
+            item = self._item.encode(value, '/'.join(key_parts))
 
             with open(data_path, 'wb') as f:
                 f.write(item)
@@ -157,7 +185,7 @@ class MelkDB:
 
         if os.path.isfile(data_file_path):
             with open(data_file_path, 'rb') as f:
-                value = self._item.decode(f)
+                value = self._item.decode(f, '/'.join(key_parts))
 
             return value
         elif os.path.isdir(data_file_path):
@@ -176,6 +204,9 @@ class MelkDB:
         :raises ItemNotExistsError: If item not exists
         """
         
+        self._delete(key, self._auto_vacuum)
+
+    def _delete(self, key: str, prune: bool) -> None:
         if not isinstance(key, str):
             raise KeyIsNotAStringError('The key must be a string')
         
@@ -193,10 +224,14 @@ class MelkDB:
         if os.path.isfile(data_file_path):
             os.remove(data_file_path)
         elif os.path.isdir(data_file_path):
+            import shutil
             shutil.rmtree(data_file_path, ignore_errors=True)
         else:
             raise ItemNotExistsError(f'Item {repr(key)} not exists')
 
+        if prune:
+            self._block.prune(os.path.dirname(data_file_path))
+
     def update(self, key: str, value: Union[str, int, float, bool]) -> None:
         """Update a item in database.
 
@@ -212,5 +247,333 @@ class MelkDB:
         :type value: Union[str, int, float, bool]
         """
 
-        self.delete(key)
+        # blocks are not pruned, since they are reused by `add()`
+        self._delete(key, False)
         self.add(key, value)
+
+    def vacuum(self, limit: Union[None, int] = None, cursor: Union[None, str] = None) -> dict:
+        """Remove empty blocks and report storage statistics.
+
+        Directories are visited bottom-up, in name order, and
+        blocks are removed if empty, so that a block emptied
+        by the removal of its sub-blocks is also removed.
+        Empty tree items are kept, so `get()` still raises
+        `KeyIsATreeError` for them.
+
+        Vacuum is incremental: at most `limit` directories
+        are visited by call and the returned `cursor` can be
+        passed to the next call to resume from where it
+        stopped (`cursor` is None when the walk is finished).
+        The statistics only cover the visited directories:
+
+        - `keys`: number of items;
+        - `bytes`: size of all items;
+        - `directories`: number of kept directories;
+        - `removed_directories`: number of removed directories;
+        - `fanout`: number of directories by entries count.
+
+        :param limit: Max directories to visit, defaults to None
+        :type limit: Union[None, int], optional
+        :param cursor: Cursor returned by a previous call, defaults to None
+        :type cursor: Union[None, str], optional
+        :raises ValueError: If limit is lower than 1
+        :return: Vacuum report
+        :rtype: dict
+        """
+
+        if limit is not None and limit < 1:
+            raise ValueError(f'limit must be at least 1, got {limit}')
+
+        report = {'keys': 0, 'bytes': 0, 'directories': 0,
+                  'removed_directories': 0, 'fanout': {}, 'cursor': None}
+
+        cursor_parts = tuple(cursor.split('/')) if cursor else None
+        cursor_len = len(cursor_parts) if cursor_parts else 0
+        visited = 0
+
+        def walk(path: str, parts: tuple) -> bool:
+            nonlocal visited
+
+            with os.scandir(path) as it:
+                sub_dirs = sorted(e.name for e in it if e.is_dir(follow_symlinks=False))
+
+            for name in sub_dirs:
+                sub_parts = parts + (name,)
+
+                if cursor_parts:
+                    # skip directories visited by previous call
+                    if sub_parts[:cursor_len] == cursor_parts:
+                        continue
+                    elif sub_parts < cursor_parts[:len(sub_parts)]:
+                        continue
+
+                if not walk(os.path.join(path, name), sub_parts):
+                    return False
+
+            entries = 0
+
+            with os.scandir(path) as it:
+                for entry in it:
+                    entries += 1
+
+                    if entry.is_file(follow_symlinks=False):
+                        if not parts and entry.name == 'config.json':
+                            continue
+
+                        report['keys'] += 1
+                        report['bytes'] += entry.stat(follow_symlinks=False).st_size
+
+            if entries == 0 and not is_tree_item_depth(len(parts)):
+                try:
+                    os.rmdir(path)
+                except OSError:
+                    pass
+                else:
+                    report['removed_directories'] += 1
+                    entries = None
+
+            if entries is not None:
+                report['directories'] += 1
+                report['fanout'][entries] = report['fanout'].get(entries, 0) + 1
+
+            visited += 1
+
+            if limit is not None and visited >= limit and parts:
+                report['cursor'] = '/'.join(parts)
+                return False
+
+            return True
+
+        walk(self._db_path, ())
+        return report
+
+    def dump(self, fileobj: BinaryIO, compress: bool = False) -> int:
+        """Dump all items to a single file.
+
+        Items are copied as stored in database, so
+        encrypted items are not decrypted. Each item
+        is checksummed and the database config is
+        stored in the dump.
+
+        :param fileobj: Binary file object
+        :type fileobj: BinaryIO
+        :param compress: Compress the dump with zlib, defaults to False
+        :type compress: bool, optional
+        :return: Number of dumped items
+        :rtype: int
+        """
+
+        from . import _dump
+
+        writer = _dump.DumpWriter(fileobj, self._config, compress)
+
+        for key, data_path in _dump.iter_items(self._db_path):
+            with open(data_path, 'rb') as f:
+                writer.write(key, f.read())
+
+        return writer.close()
+
+    @classmethod
+    def restore(cls, name: str, fileobj: BinaryIO,
+                encrypt_key: Union[None, str] = None) -> 'MelkDB':
+        """Create a database from a dump.
+
+        The dump of an encrypted database must be
+        restored with the original encrypt key. If the
+        key is wrong, the partial database is removed.
+
+        :param name: Database name
+        :type name: str
+        :param fileobj: Binary file object
+        :type fileobj: BinaryIO
+        :param encrypt_key: Encrypt key, defaults to None
+        :type encrypt_key: Union[None, str], optional
+        :raises DatabaseAlreadyExistsError: If database exists
+        :raises InvalidDumpError: If dump is invalid or corrupted
+        :raises DecryptFailed: If encrypt key don't match the dump
+        :return: Restored database
+        :rtype: MelkDB
+        """
+
+        db_path = os.path.join(MELKDB_STORAGE_PATH, name)
+
+        if os.path.exists(db_path):
+            raise DatabaseAlreadyExistsError(f'{repr(name)} already exists')
+
+        from . import _dump
+
+        reader = _dump.DumpReader(fileobj)
+        os.makedirs(db_path)
+
+        try:
+            import json
+
+            with open(os.path.join(db_path, 'config.json'), 'w') as f:
+                json.dump(reader.config, f)
+
+            db = cls(name, encrypt_key=encrypt_key)
+            block_paths = set()
+            key_verified = not encrypt_key
+
+            for key, item in reader:
+                key_parts = key.split('/')
+
+                if not utils.key_is_valid(key) or any(kp in ('', '.', '..') for kp in key_parts):
+                    raise InvalidDumpError(f'Key {repr(key)} is not valid')
+
+                data_path = db._block.get_tree_path(key_parts)
+                block_path = os.path.dirname(data_path)
+
+                # each block is created only once
+                if block_path not in block_paths:
+                    if len(block_paths) >= RESTORE_CACHE_SIZE:
+                        block_paths.clear()
+
+                    os.makedirs(block_path, exist_ok=True)
+                    block_paths.add(block_path)
+
+                with open(data_path, 'wb') as f:
+                    f.write(item)
+
+                # the first item is decrypted to check the encrypt key
+                if not key_verified:
+                    try:
+                        db.get(key)
+                    except DecryptFailed:
+                        raise DecryptFailed(f'encrypt key don\'t match the dump of {repr(name)}') from None
+
+                    key_verified = True
+        except BaseException:
+            import shutil
+            shutil.rmtree(db_path, ignore_errors=True)
+            raise
+
+        return db
+
+    def _is_tree(self, key: str) -> bool:
+        key_parts = [p for p in key.split('/') if p]
+
+        if not key_parts:
+            return False
+
+        return os.path.isdir(self._block.get_tree_path(key_parts))
+
+    def _modify(self, key: str, function: Callable,
+                default: Union[str, int, float]) -> Union[str, int, float]:
+        if not isinstance(key, str):
+            raise KeyIsNotAStringError('The key must be a string')
+
+        if not utils.key_is_valid(key):
+            raise InvalidCharInKeyError(f'Key {repr(key)} is not valid')
+
+        key_parts = [p for p in key.split('/') if p]
+        item_key = '/'.join(key_parts)
+
+        if len(key_parts) > 1:
+            data_file_path = self._make_tree_path(key_parts)
+        else:
+            block_path = self._block.make_path(key)
+            data_file_path = os.path.join(block_path, key)
+
+        if os.path.isdir(data_file_path):
+            raise KeyIsATreeError(f'you can\'t modify the full {repr(key)} tree')
+
+        default_item = self._item.encode(default, item_key)
+        fd = os.open(data_file_path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0))
+
+        try:
+            utils.lock_file(fd)
+
+            try:
+                if os.fstat(fd).st_size == 0:
+                    # item created by this operation
+                    utils.pwrite(fd, default_item, 0)
+                    return self._item.stored_value(default)
+
+                return self._item.modify(fd, function, item_key)
+            finally:
+                utils.unlock_file(fd)
+        finally:
+            os.close(fd)
+
+    def incr(self, key: str, delta: Union[int, float] = 1) -> Union[int, float]:
+        """Increment a number item atomically.
+
+        The item is locked during the operation, so
+        concurrent increments (even from other processes)
+        are not lost. For items without cryptography, the
+        value is written in place, without recreating the
+        item file. A missing item is created with `delta`.
+
+        :param key: Item key
+        :type key: str
+        :param delta: Value to add, defaults to 1
+        :type delta: Union[int, float], optional
+        :raises ValueNotSupportedError: If delta or item
+        value is not a number, or if the new int value is
+        out of the 4 bytes range
+        :raises KeyIsATreeError: If key is a tree
+        :return: Returns the new item value
+        :rtype: Union[int, float]
+        """
+
+        if isinstance(delta, bool) or not isinstance(delta, (int, float)):
+            raise ValueNotSupportedError(f'type {type(delta)} is not supported')
+
+        def increment(value):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueNotSupportedError(f'Item {repr(key)} is not a number')
+
+            return value + delta
+
+        return self._modify(key, increment, delta)
+
+    def decr(self, key: str, delta: Union[int, float] = 1) -> Union[int, float]:
+        """Decrement a number item atomically.
+
+        This method is just a shortcut to use
+        `incr()` method with a negative delta.
+
+        :param key: Item key
+        :type key: str
+        :param delta: Value to subtract, defaults to 1
+        :type delta: Union[int, float], optional
+        :return: Returns the new item value
+        :rtype: Union[int, float]
+        """
+
+        if isinstance(delta, bool) or not isinstance(delta, (int, float)):
+            raise ValueNotSupportedError(f'type {type(delta)} is not supported')
+
+        return self.incr(key, -delta)
+
+    def append(self, key: str, text: str) -> str:
+        """Append a text to a string item atomically.
+
+        The item is locked during the operation. For
+        items without cryptography, only the text and
+        the new length are written. A missing item is
+        created with `text`.
+
+        :param key: Item key
+        :type key: str
+        :param text: Text to append
+        :type text: str
+        :raises ValueNotSupportedError: If text or item
+        value is not a string, or if the new value is
+        longer than 32767 chars
+        :raises KeyIsATreeError: If key is a tree
+        :return: Returns the new item value
+        :rtype: str
+        """
+
+        if not isinstance(text, str):
+            raise ValueNotSupportedError(f'type {type(text)} is not supported')
+
+        def append_text(value):
+            if not isinstance(value, str):
+                raise ValueNotSupportedError(f'Item {repr(key)} is not a string')
+
+            return value + text
+
+        return self._modify(key, append_text, text)
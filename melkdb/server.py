@@ -0,0 +1,269 @@
+import os
+import stat
+import socket
+import socketserver
+import threading
+from io import BytesIO
+from typing import Union, Dict, Tuple
+
+from .melkdb import MelkDB
+from .exceptions import ServerError
+from ._item import Item
+from . import _protocol
+
+RECV_SIZE = 65536
+CACHE_SIZE = 65536
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socket, 'AF_UNIX'):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    def setup(self) -> None:
+        if self.request.family != getattr(socket, 'AF_UNIX', None):
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self) -> None:
+        melkdb_server = self.server.melkdb_server
+        buffer = bytearray()
+        db_name = None
+
+        while True:
+            try:
+                data = self.request.recv(RECV_SIZE)
+            except ConnectionError:
+                break
+
+            if not data:
+                break
+
+            buffer += data
+            frames, consumed = _protocol.unpack_frames(buffer)
+            del buffer[:consumed]
+
+            if not frames:
+                continue
+
+            # all responses of a pipeline are sent at once
+            response = bytearray()
+
+            for op, payload in frames:
+                if op == _protocol.OP_SELECT:
+                    try:
+                        melkdb_server.get_database(payload.decode())
+                    except Exception as error:
+                        response += _protocol.pack_frame(_protocol.STATUS_ERROR, _protocol.pack_error(error))
+                    else:
+                        db_name = payload.decode()
+                        response += _protocol.pack_frame(_protocol.STATUS_OK)
+                else:
+                    response += melkdb_server.handle_request(db_name, op, payload)
+
+            try:
+                self.request.sendall(response)
+            except ConnectionError:
+                break
+
+
+class MelkDBServer:
+    def __init__(self, socket_path: Union[None, str] = None,
+                 address: Union[None, Tuple[str, int]] = None,
+                 encrypt_keys: Union[None, Dict[str, str]] = None) -> None:
+        """Create a instance of MelkDBServer class.
+
+        The server hosts databases behind a Unix domain
+        socket (or a TCP address), so that multiple
+        processes share the same `MelkDB` instances and
+        a cache of read values. Databases are opened on
+        the first client request.
+
+        Each request is a frame with four bytes to store
+        the payload length, one byte to store the operation
+        and the payload (key and item value, using the `Item`
+        encoding). Clients may pipeline requests: all
+        responses of a received batch are sent at once.
+
+        :param socket_path: Unix socket path, defaults to None
+        :type socket_path: Union[None, str], optional
+        :param address: TCP address (host, port), defaults to None
+        :type address: Union[None, Tuple[str, int]], optional
+        :param encrypt_keys: Encrypt key of each encrypted
+        database, defaults to None
+        :type encrypt_keys: Union[None, Dict[str, str]], optional
+        :raises ValueError: If no socket path or address is given
+        :raises ServerError: If socket path exists and is not a
+        stale socket
+        """
+
+        self._encrypt_keys = encrypt_keys or {}
+        self._databases = {}
+        self._databases_lock = threading.Lock()
+        self._item = Item()
+
+        if socket_path:
+            if os.path.exists(socket_path):
+                self._remove_stale_socket(socket_path)
+
+            server_class = _UnixServer
+            server_address = socket_path
+        elif address:
+            server_class = _TCPServer
+            server_address = address
+        else:
+            raise ValueError('a socket path or a TCP address is required')
+
+        self._server = server_class(server_address, _RequestHandler)
+        self._server.melkdb_server = self
+        self._socket_path = socket_path
+
+    @staticmethod
+    def _remove_stale_socket(socket_path: str) -> None:
+        if not stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            raise ServerError(f'{repr(socket_path)} exists and is not a socket')
+
+        test_sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+        try:
+            test_sock.connect(socket_path)
+        except OSError:
+            # no server is listening, the socket is stale
+            os.remove(socket_path)
+        else:
+            raise ServerError(f'a server is already listening on {repr(socket_path)}')
+        finally:
+            test_sock.close()
+
+    @property
+    def server_address(self) -> Union[str, Tuple[str, int]]:
+        return self._server.server_address
+
+    def get_database(self, name: str) -> Tuple[MelkDB, threading.Lock, dict]:
+        """Get a hosted database, opening it if necessary.
+
+        :param name: Database name
+        :type name: str
+        :raises ServerError: If name is not a valid database name
+        :return: Database, its lock and its values cache
+        :rtype: Tuple[MelkDB, threading.Lock, dict]
+        """
+
+        # name must not point outside the storage directory
+        if (not name or name in ('.', '..') or os.path.isabs(name)
+                or '/' in name or os.sep in name or (os.altsep and os.altsep in name)):
+            raise ServerError(f'invalid database name {repr(name)}')
+
+        with self._databases_lock:
+            database = self._databases.get(name)
+
+            if not database:
+                db = MelkDB(name, encrypt_key=self._encrypt_keys.get(name))
+                database = (db, threading.Lock(), {})
+                self._databases[name] = database
+
+        return database
+
+    @staticmethod
+    def _cache_value(cache: dict, key: str, value: Union[str, int, float, bool]) -> None:
+        if key not in cache and len(cache) >= CACHE_SIZE:
+            del cache[next(iter(cache))]
+
+        cache[key] = value
+
+    @staticmethod
+    def _discard_value(db: MelkDB, cache: dict, key: str) -> None:
+        cache.pop(key, None)
+
+        # cached items are only scanned if the key is a tree
+        if db._is_tree(key):
+            tree_prefix = key + '/'
+
+            for cached_key in [k for k in cache if k.startswith(tree_prefix)]:
+                del cache[cached_key]
+
+    def handle_request(self, db_name: Union[None, str], op: int, payload: bytes) -> bytes:
+        """Run a client request in database.
+
+        :param db_name: Selected database name
+        :type db_name: Union[None, str]
+        :param op: Operation code
+        :type op: int
+        :param payload: Request payload
+        :type payload: bytes
+        :return: Response frame
+        :rtype: bytes
+        """
+
+        try:
+            if db_name is None:
+                raise ServerError('no database selected')
+
+            db, lock, cache = self.get_database(db_name)
+            key, value = _protocol.unpack_key(payload)
+            cache_key = '/'.join(p for p in key.split('/') if p)
+            result = b''
+
+            with lock:
+                if op == _protocol.OP_GET:
+                    if cache_key in cache:
+                        value = cache[cache_key]
+                    else:
+                        value = db.get(key)
+
+                        if value is not None:
+                            self._cache_value(cache, cache_key, value)
+
+                    if value is not None:
+                        result = self._item.encode(value)
+                elif op in (_protocol.OP_ADD, _protocol.OP_UPDATE):
+                    value = self._item.decode(BytesIO(value))
+
+                    if op == _protocol.OP_ADD:
+                        db.add(key, value)
+                    else:
+                        # update may replace a tree by a item
+                        self._discard_value(db, cache, cache_key)
+                        db.update(key, value)
+
+                    self._cache_value(cache, cache_key, value)
+                elif op in (_protocol.OP_INCR, _protocol.OP_APPEND):
+                    value = self._item.decode(BytesIO(value))
+
+                    if op == _protocol.OP_INCR:
+                        value = db.incr(key, value)
+                    else:
+                        value = db.append(key, value)
+
+                    self._cache_value(cache, cache_key, value)
+                    result = self._item.encode(value)
+                elif op == _protocol.OP_DELETE:
+                    # the key may be a tree, so its cached
+                    # items are discarded too
+                    self._discard_value(db, cache, cache_key)
+                    db.delete(key)
+                else:
+                    raise ServerError(f'operation {op} is not supported')
+        except Exception as error:
+            return _protocol.pack_frame(_protocol.STATUS_ERROR, _protocol.pack_error(error))
+
+        return _protocol.pack_frame(_protocol.STATUS_OK, result)
+
+    def serve_forever(self) -> None:
+        """Handle client requests until shutdown."""
+
+        self._server.serve_forever()
+
+    def shutdown(self) -> None:
+        """Stop the server loop and close the socket."""
+
+        self._server.shutdown()
+        self._server.server_close()
+
+        if self._socket_path and os.path.exists(self._socket_path):
+            os.remove(self._socket_path)
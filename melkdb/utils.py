@@ -1,3 +1,11 @@
+import os
+
+# Stands in for `typing.TYPE_CHECKING`: importing typing costs
+# a few milliseconds, so modules import this flag instead and
+# keep their typing imports behind it. Type checkers treat any
+# name called TYPE_CHECKING as true.
+TYPE_CHECKING = False
+
 INVALID_CHARS = ('\'', '\0', ':', '|', '*', '?',
                  '<', '>', '\n', '\r', '\t', '"', "'", '\v')
 
@@ -8,3 +16,56 @@ def key_is_valid(key: str) -> bool:
             return False
         
     return True
+
+
+def lock_file(fd: int) -> None:
+    """Lock a file exclusively.
+
+    On POSIX systems, this waits until the lock is
+    released by other processes. On Windows, the lock
+    is retried for about 10 seconds and `OSError` is
+    raised if the file is still locked.
+
+    :param fd: File descriptor
+    :type fd: int
+    """
+
+    if os.name == 'nt':
+        import msvcrt
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+
+def unlock_file(fd: int) -> None:
+    """Unlock a file locked by `lock_file`.
+
+    :param fd: File descriptor
+    :type fd: int
+    """
+
+    if os.name == 'nt':
+        import msvcrt
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def pread(fd: int, size: int, offset: int) -> bytes:
+    if hasattr(os, 'pread'):
+        return os.pread(fd, size, offset)
+
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, size)
+
+
+def pwrite(fd: int, data: bytes, offset: int) -> None:
+    if hasattr(os, 'pwrite'):
+        os.pwrite(fd, data, offset)
+    else:
+        os.lseek(fd, offset, os.SEEK_SET)
+        os.write(fd, data)
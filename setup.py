@@ -19,6 +19,9 @@ setup(
     license='MIT License',
     install_requires=['pycryptodome==3.20'],
     packages=['melkdb'],
+    entry_points={
+        'console_scripts': ['melkdb=melkdb.__main__:main']
+    },
     url='https://github.com/jaedsonpys/melkdb',
     project_urls={
         'License': 'https://github.com/jaedsonpys/melkdb/blob/master/LICENSE',
@@ -46,4 +46,40 @@ for choose in range(DATA_NUM):
     get_time = e_get-s_get
     full_get_time += get_time
 
-print(f'\033[32mGet all items in {full_get_time:.4f}\033[m')
\ No newline at end of file
+print(f'\033[32mGet all items in {full_get_time:.4f}\033[m')
+print('-=' * 15)
+print('\033[33mMeasuring cipher cost by item...\033[m')
+
+from melkdb import crypto
+from melkdb._item import Item
+
+CIPHER_RUNS = 20_000
+item = Item().encode('MelkDB!')
+salt = bytes(crypto.SALT_SIZE)
+
+ciphers = {
+    crypto.LEGACY_CIPHER: crypto.Cryptography('speedtest-secret-key'),
+    crypto.AES_OCB_CIPHER: crypto.AEADCryptography('speedtest-secret-key', salt)
+}
+
+for cipher_name, cipher in ciphers.items():
+    s_enc = time()
+
+    for __ in range(CIPHER_RUNS):
+        token = cipher.encrypt(item, b'key')
+
+    e_enc = time()
+
+    for __ in range(CIPHER_RUNS):
+        cipher.decrypt(token, b'key')
+
+    e_dec = time()
+
+    enc_us = (e_enc - s_enc) / CIPHER_RUNS * 1_000_000
+    dec_us = (e_dec - e_enc) / CIPHER_RUNS * 1_000_000
+    print(f'{cipher_name}: encrypt {enc_us:.1f}us, decrypt {dec_us:.1f}us, '
+          f'overhead {len(token) - len(item)} bytes')
+
+s_kdf = time()
+crypto.AEADCryptography('speedtest-secret-key', salt)
+print(f'Key derivation (once per database open) in {(time() - s_kdf):.4f}')
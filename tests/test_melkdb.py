@@ -1,4 +1,12 @@
+import os
+import json
+import sys
+import shutil
 import struct
+import tempfile
+import subprocess
+import threading
+import tracemalloc
 from io import BytesIO
 
 import bupytest
@@ -7,6 +15,9 @@ from melkdb import crypto
 from melkdb import melkdb
 from melkdb import _item
 from melkdb import exceptions
+from melkdb import server
+from melkdb import client
+from melkdb import _dump
 
 INT_TYPE = -1
 FLOAT_TYPE = -2
@@ -43,6 +54,44 @@ class TestCryptography(bupytest.UnitTest):
             self.assert_true(False, message='Expected exception not raised')
 
 
+class TestAEADCryptography(bupytest.UnitTest):
+    def __init__(self):
+        super().__init__()
+
+        salt = bytes(crypto.SALT_SIZE)
+        self.crypto = crypto.AEADCryptography('secret-key', salt)
+        self.second_crypto = crypto.AEADCryptography('false-secret-key', salt)
+
+    def test_cryptography(self):
+        data = b'Hello, world!'
+
+        encrypted = self.crypto.encrypt(data, b'greeting')
+        decrypted = self.crypto.decrypt(encrypted, b'greeting')
+
+        self.assert_expected(decrypted, data, message='"decrypted" is not equal to original')
+        self.assert_expected(len(encrypted), len(data) + 28, message='Invalid token overhead')
+
+    def test_decrypt_with_different_key(self):
+        encrypted = self.crypto.encrypt(b'Hello, world!', b'greeting')
+
+        try:
+            self.second_crypto.decrypt(encrypted, b'greeting')
+        except exceptions.DecryptFailed:
+            self.assert_true(True)
+        else:
+            self.assert_true(False, message='Expected exception not raised')
+
+    def test_decrypt_with_different_associated_data(self):
+        encrypted = self.crypto.encrypt(b'Hello, world!', b'greeting')
+
+        try:
+            self.crypto.decrypt(encrypted, b'farewell')
+        except exceptions.DecryptFailed:
+            self.assert_true(True)
+        else:
+            self.assert_true(False, message='Expected exception not raised')
+
+
 class TestItem(bupytest.UnitTest):
     def __init__(self):
         super().__init__()
@@ -109,6 +158,85 @@ class TestMelkDB(bupytest.UnitTest):
         data = self.db.get('users/mel/name')
         self.assert_expected(data, 'Mel', message='Secundary item modified')
 
+    def test_incr(self):
+        for key in ('counters/visits', 'counters/ratio'):
+            if self.db.get(key) is not None:
+                self.db.delete(key)
+
+        self.assert_expected(self.db.incr('counters/visits'), 1, message='Missing item not created')
+        self.assert_expected(self.db.incr('counters/visits', 10), 11, message='Item not incremented')
+        self.assert_expected(self.db.decr('counters/visits', 2), 9, message='Item not decremented')
+        self.assert_expected(self.db.get('counters/visits'), 9, message='Data is not equal to original')
+
+        self.db.add('counters/ratio', 1.5)
+        self.db.incr('counters/ratio', 1)
+        self.assert_expected(self.db.get('counters/ratio'), 2.5, message='Float item not incremented')
+
+    def test_append(self):
+        self.db.update('users/mel/name', 'Mel')
+        self.assert_expected(self.db.append('users/mel/name', ' Silva'), 'Mel Silva', message='Text not appended')
+        self.assert_expected(self.db.get('users/mel/name'), 'Mel Silva', message='Data is not equal to original')
+        self.db.update('users/mel/name', 'Mel')
+
+    def test_incr_out_of_range(self):
+        self.db.update('counters/visits', 2 ** 31 - 1)
+
+        try:
+            self.db.incr('counters/visits')
+        except exceptions.ValueNotSupportedError:
+            self.assert_true(True)
+        else:
+            self.assert_true(False, message='Expected exception not raised')
+
+        self.assert_expected(self.db.get('counters/visits'), 2 ** 31 - 1, message='Item modified')
+
+    def test_append_too_long(self):
+        if self.db.get('logs/last') is not None:
+            self.db.delete('logs/last')
+
+        self.db.add('logs/last', 'a' * 32760)
+
+        try:
+            self.db.append('logs/last', 'b' * 10)
+        except exceptions.ValueNotSupportedError:
+            self.assert_true(True)
+        else:
+            self.assert_true(False, message='Expected exception not raised')
+
+        self.assert_expected(self.db.get('logs/last'), 'a' * 32760, message='Item modified')
+
+    def test_incr_float(self):
+        self.db.update('counters/ratio', 0.0)
+        value = self.db.incr('counters/ratio', 0.1)
+        self.assert_expected(value, self.db.get('counters/ratio'), message='Returned value is not the stored value')
+
+    def test_incr_not_a_number(self):
+        try:
+            self.db.incr('users/mel/name')
+        except exceptions.ValueNotSupportedError:
+            self.assert_true(True)
+        else:
+            self.assert_true(False, message='Expected exception not raised')
+
+
+    def test_concurrent_incr(self):
+        if self.db.get('counters/hits') is not None:
+            self.db.delete('counters/hits')
+
+        def increment():
+            for __ in range(50):
+                self.db.incr('counters/hits')
+
+        threads = [threading.Thread(target=increment) for __ in range(4)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assert_expected(self.db.get('counters/hits'), 200, message='Increments lost')
+
 
 class TestMelkDBEncrypted(bupytest.UnitTest):
     def __init__(self):
@@ -151,6 +279,386 @@ class TestMelkDBEncrypted(bupytest.UnitTest):
         data = self.db.get('users/mel/name')
         self.assert_expected(data, 'Mel', message='Secundary item modified')
 
+    def test_incr(self):
+        for key in ('counters/visits', 'counters/ratio'):
+            if self.db.get(key) is not None:
+                self.db.delete(key)
+
+        self.assert_expected(self.db.incr('counters/visits'), 1, message='Missing item not created')
+        self.assert_expected(self.db.incr('counters/visits', 10), 11, message='Item not incremented')
+        self.assert_expected(self.db.decr('counters/visits', 2), 9, message='Item not decremented')
+        self.assert_expected(self.db.get('counters/visits'), 9, message='Data is not equal to original')
+
+        self.db.add('counters/ratio', 1.5)
+        self.db.incr('counters/ratio', 1)
+        self.assert_expected(self.db.get('counters/ratio'), 2.5, message='Float item not incremented')
+
+    def test_append(self):
+        self.db.update('users/mel/name', 'Mel')
+        self.assert_expected(self.db.append('users/mel/name', ' Silva'), 'Mel Silva', message='Text not appended')
+        self.assert_expected(self.db.get('users/mel/name'), 'Mel Silva', message='Data is not equal to original')
+        self.db.update('users/mel/name', 'Mel')
+
+    def test_incr_out_of_range(self):
+        self.db.update('counters/visits', 2 ** 31 - 1)
+
+        try:
+            self.db.incr('counters/visits')
+        except exceptions.ValueNotSupportedError:
+            self.assert_true(True)
+        else:
+            self.assert_true(False, message='Expected exception not raised')
+
+        self.assert_expected(self.db.get('counters/visits'), 2 ** 31 - 1, message='Item modified')
+
+    def test_append_too_long(self):
+        if self.db.get('logs/last') is not None:
+            self.db.delete('logs/last')
+
+        self.db.add('logs/last', 'a' * 32760)
+
+        try:
+            self.db.append('logs/last', 'b' * 10)
+        except exceptions.ValueNotSupportedError:
+            self.assert_true(True)
+        else:
+            self.assert_true(False, message='Expected exception not raised')
+
+        self.assert_expected(self.db.get('logs/last'), 'a' * 32760, message='Item modified')
+
+    def test_incr_float(self):
+        self.db.update('counters/ratio', 0.0)
+        value = self.db.incr('counters/ratio', 0.1)
+        self.assert_expected(value, self.db.get('counters/ratio'), message='Returned value is not the stored value')
+
+    def test_incr_not_a_number(self):
+        try:
+            self.db.incr('users/mel/name')
+        except exceptions.ValueNotSupportedError:
+            self.assert_true(True)
+        else:
+            self.assert_true(False, message='Expected exception not raised')
+
+
+class TestMelkDBLegacyCipher(bupytest.UnitTest):
+    def __init__(self):
+        super().__init__()
+
+        db_path = os.path.join(melkdb.MELKDB_STORAGE_PATH, 'legacy-cipher')
+
+        if not os.path.isdir(db_path):
+            os.makedirs(db_path)
+
+            with open(os.path.join(db_path, 'config.json'), 'w') as f:
+                json.dump({'version': melkdb.__version__, 'iscrypto': True}, f)
+
+        self.db = melkdb.MelkDB('legacy-cipher', encrypt_key='thisisanotsecurekey')
+
+    def test_legacy_cipher(self):
+        self.assert_true(isinstance(self.db._item._crypto, crypto.Cryptography),
+                         message='Legacy cipher not used')
+
+    def test_add_and_get(self):
+        self.db.add('users/melk/name', 'Melk')
+        self.assert_expected(self.db.get('users/melk/name'), 'Melk', message='Data is not equal to original')
+
+
+class TestVacuum(bupytest.UnitTest):
+    def __init__(self):
+        super().__init__()
+
+        self.db = melkdb.MelkDB('vacuum')
+        self.db.vacuum()
+
+    def _count_directories(self):
+        return sum(len(dirs) for __, dirs, __ in os.walk(self.db._db_path))
+
+    def test_vacuum(self):
+        for i in range(20):
+            self.db.add(f'sessions/user{i}/token', 'abc')
+
+        self.db.add('sessions/user0/name', 'Melk')
+
+        for i in range(20):
+            self.db.delete(f'sessions/user{i}/token')
+
+        report = self.db.vacuum()
+
+        self.assert_expected(report['keys'], 1, message='Invalid keys count')
+        self.assert_expected(report['cursor'], None, message='Vacuum not finished')
+        self.assert_expected(report['directories'], self._count_directories() + 1,
+                             message='Invalid directories count')
+        self.assert_true(report['removed_directories'] > 0, message='Empty blocks not removed')
+        self.assert_expected(self.db.get('sessions/user0/name'), 'Melk', message='Item removed by vacuum')
+
+    def test_incremental_vacuum(self):
+        for i in range(20):
+            self.db.add(f'cache/item{i}', i)
+            self.db.delete(f'cache/item{i}')
+
+        report = self.db.vacuum(limit=2)
+        removed = report['removed_directories']
+        keys = report['keys']
+
+        while report['cursor']:
+            report = self.db.vacuum(limit=2, cursor=report['cursor'])
+            removed += report['removed_directories']
+            keys += report['keys']
+
+        full_report = self.db.vacuum()
+
+        self.assert_true(removed > 0, message='Empty blocks not removed')
+        self.assert_expected(keys, full_report['keys'], message='Items visited twice or skipped')
+        self.assert_expected(full_report['removed_directories'], 0, message='Empty blocks not removed')
+
+    def test_invalid_limit(self):
+        try:
+            self.db.vacuum(limit=0)
+        except ValueError:
+            self.assert_true(True)
+        else:
+            self.assert_true(False, message='Expected exception not raised')
+
+    def test_vacuum_keeps_trees(self):
+        try:
+            self.db.get('sessions/user5')
+        except exceptions.KeyIsATreeError:
+            self.assert_true(True)
+        else:
+            self.assert_true(False, message='Empty tree removed by vacuum')
+
+    def test_auto_vacuum(self):
+        db = melkdb.MelkDB('vacuum', auto_vacuum=True)
+
+        try:
+            db.delete('logs')
+        except exceptions.ItemNotExistsError:
+            pass
+
+        db.add('logs/2024/first', 'Melk')
+        db.add('logs/2024/second', 'Mel')
+        directories = self._count_directories()
+
+        db.delete('logs/2024/first')
+        self.assert_expected(self._count_directories(), directories - 3, message='Empty blocks not removed')
+
+        db.delete('logs/2024/second')
+
+        try:
+            db.get('logs/2024')
+        except exceptions.KeyIsATreeError:
+            self.assert_true(True)
+        else:
+            self.assert_true(False, message='Empty tree removed by auto vacuum')
+
+
+class TestDump(bupytest.UnitTest):
+    def __init__(self):
+        super().__init__()
+
+        self.db = melkdb.MelkDB('dump-source', encrypt_key='thisisanotsecurekey')
+
+        for i in range(50):
+            self.db.add(f'users/user{i}/name', f'User {i}')
+            self.db.add(f'users/user{i}/age', i)
+
+        self.db.add('latest_user_online', 'Melk')
+
+    def _restore(self, name, dump_file):
+        db_path = os.path.join(melkdb.MELKDB_STORAGE_PATH, name)
+
+        if os.path.isdir(db_path):
+            shutil.rmtree(db_path)
+
+        return melkdb.MelkDB.restore(name, dump_file, encrypt_key='thisisanotsecurekey')
+
+    def test_dump_and_restore(self):
+        for compress in (False, True):
+            dump_file = BytesIO()
+            count = self.db.dump(dump_file, compress=compress)
+            dump_file.seek(0)
+
+            db = self._restore('dump-target', dump_file)
+
+            self.assert_expected(count, 101, message='Invalid dumped items count')
+            self.assert_expected(db.get('users/user7/name'), 'User 7', message='Data is not equal to original')
+            self.assert_expected(db.get('users/user49/age'), 49, message='Data is not equal to original')
+            self.assert_expected(db.get('latest_user_online'), 'Melk', message='Data is not equal to original')
+
+    def test_corrupted_dump(self):
+        dump_file = BytesIO()
+        self.db.dump(dump_file)
+
+        data = bytearray(dump_file.getvalue())
+        data[-20] ^= 0xff
+
+        try:
+            self._restore('dump-corrupted', BytesIO(data))
+        except exceptions.InvalidDumpError:
+            self.assert_true(True)
+        else:
+            self.assert_true(False, message='Expected exception not raised')
+
+        db_path = os.path.join(melkdb.MELKDB_STORAGE_PATH, 'dump-corrupted')
+        self.assert_false(os.path.isdir(db_path), message='Corrupted restore not removed')
+
+    def test_restore_with_wrong_key(self):
+        dump_file = BytesIO()
+        self.db.dump(dump_file)
+        dump_file.seek(0)
+
+        try:
+            melkdb.MelkDB.restore('dump-wrong-key', dump_file, encrypt_key='wrong-key')
+        except exceptions.DecryptFailed:
+            self.assert_true(True)
+        else:
+            self.assert_true(False, message='Expected exception not raised')
+
+        db_path = os.path.join(melkdb.MELKDB_STORAGE_PATH, 'dump-wrong-key')
+        self.assert_false(os.path.isdir(db_path), message='Unreadable database not removed')
+
+    def test_compressed_dump_memory(self):
+        dump_file = BytesIO()
+        writer = _dump.DumpWriter(dump_file, {}, compress=True)
+        item = _item.Item().encode('a' * 32000)
+
+        for i in range(3000):
+            writer.write(f'logs/{i}', item)
+
+        writer.close()
+        dump_file.seek(0)
+
+        tracemalloc.start()
+        key, __ = next(iter(_dump.DumpReader(dump_file)))
+        __, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.assert_expected(key, 'logs/0', message='Invalid first record')
+        self.assert_true(peak < 8 * _dump.CHUNK_SIZE, message=f'Peak memory of {peak} bytes')
+
+
+class TestImport(bupytest.UnitTest):
+    def __init__(self):
+        super().__init__()
+
+    def test_import_side_effects(self):
+        home_path = tempfile.mkdtemp()
+        code = ('import sys, melkdb;'
+                'print(any(m.startswith(("Crypto", "melkdb.crypto")) for m in sys.modules))')
+
+        env = dict(os.environ, HOME=home_path)
+        result = subprocess.run([sys.executable, '-c', code], env=env,
+                                stdout=subprocess.PIPE, universal_newlines=True, check=True)
+
+        self.assert_expected(result.stdout.strip(), 'False', message='Crypto stack loaded on import')
+        self.assert_false(os.listdir(home_path), message='Storage directory created on import')
+
+
+class TestMelkDBServer(bupytest.UnitTest):
+    def __init__(self):
+        super().__init__()
+
+        socket_path = os.path.join(tempfile.mkdtemp(), 'melkdb.sock')
+        self.server = server.MelkDBServer(socket_path=socket_path)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.client = client.MelkDBClient('server-users', socket_path=socket_path)
+
+    def test_add_and_get(self):
+        self.client.add('users/melk/name', 'Melk')
+        self.client.add('users/melk/age', 18)
+
+        self.assert_expected(self.client.get('users/melk/name'), 'Melk', message='Data is not equal to original')
+        self.assert_expected(self.client.get('users/melk/age'), 18, message='Data is not equal to original')
+
+    def test_update(self):
+        self.client.update('users/melk/name', 'Melk Silva')
+        self.assert_expected(self.client.get('users/melk/name'), 'Melk Silva', message='Data not updated in database')
+
+    def test_pipeline(self):
+        with self.client.pipeline() as pipe:
+            for i in range(100):
+                pipe.add(f'counters/{i}', i)
+
+        results = self.client.pipeline().get('counters/0').get('counters/99').get('counters/100').execute()
+        self.assert_expected(results, [0, 99, None], message='Invalid pipeline results')
+
+    def test_incr_and_append(self):
+        self.client.add('counters/visits', 0)
+        self.client.incr('counters/visits', 5)
+
+        self.assert_expected(self.client.decr('counters/visits'), 4, message='Item not decremented')
+        self.assert_expected(self.client.append('users/melk/name', '!'), 'Melk Silva!', message='Text not appended')
+
+    def test_delete(self):
+        self.client.delete('users/melk')
+        self.assert_false(self.client.get('users/melk/name'), message='Data not deleted from database')
+
+    def test_remote_exception(self):
+        try:
+            self.client.delete('users/melk')
+        except exceptions.ItemNotExistsError:
+            self.assert_true(True)
+        else:
+            self.assert_true(False, message='Expected exception not raised')
+
+    def test_update_over_tree(self):
+        self.client.add('trees/a/b', 'child')
+        self.assert_expected(self.client.get('trees/a/b'), 'child', message='Data is not equal to original')
+
+        self.client.update('trees/a', 'leaf')
+
+        self.assert_expected(self.client.get('trees/a'), 'leaf', message='Data not updated in database')
+        self.assert_expected(self.client.get('trees/a/b'), None, message='Stale item returned by cache')
+        self.client.delete('trees')
+
+    def test_pipeline_results(self):
+        with self.client.pipeline() as pipe:
+            pipe.add('counters/pipe', 10)
+            pipe.get('counters/pipe')
+
+        self.assert_expected(pipe.results, [None, 10], message='Invalid pipeline results')
+
+    def test_invalid_database_name(self):
+        socket_path = self.server.server_address
+
+        for name in ('../../evil', '/tmp/evil', '..', '.'):
+            try:
+                client.MelkDBClient(name, socket_path=socket_path).get('key')
+            except exceptions.ServerError:
+                self.assert_true(True)
+            else:
+                self.assert_true(False, message=f'Database name {repr(name)} accepted')
+
+    def test_socket_path_in_use(self):
+        regular_file = os.path.join(tempfile.mkdtemp(), 'file')
+
+        with open(regular_file, 'w') as f:
+            f.write('data')
+
+        for socket_path in (regular_file, self.server.server_address):
+            try:
+                server.MelkDBServer(socket_path=socket_path)
+            except exceptions.ServerError:
+                self.assert_true(True)
+            else:
+                self.assert_true(False, message=f'{repr(socket_path)} replaced')
+
+        self.assert_true(os.path.isfile(regular_file), message='Regular file removed')
+
+    def test_stale_socket(self):
+        socket_path = os.path.join(tempfile.mkdtemp(), 'stale.sock')
+        stale_server = server.MelkDBServer(socket_path=socket_path)
+        stale_server._server.server_close()
+
+        new_server = server.MelkDBServer(socket_path=socket_path)
+        new_server._server.server_close()
+        self.assert_true(os.path.exists(socket_path), message='Socket not created')
+
+    def test_shutdown(self):
+        self.client.close()
+        self.server.shutdown()
+
 
 if __name__ == '__main__':
     bupytest.this()